@@ -117,6 +117,8 @@ def get_TStar_search_results(args, data_item,
         output_dir=args.output_dir,
         confidence_threshold=args.confidence_threshold,
         search_budget=args.search_budget,
+        batch_size=args.batch_size,
+        iterations_format=args.iterations_format,
     )
 
     # Use Grounder to get target and cue objects
@@ -125,6 +127,7 @@ def get_TStar_search_results(args, data_item,
     video_searcher = TStar_searcher.initialize_videoSearcher(target_objects, cue_objects)
     # Perform search
     all_frames, time_stamps = TStar_searcher.perform_search(video_searcher, visualization=True)
+    TStar_searcher.video.close()
     time_stamps.sort()
 
     # Output the results
@@ -140,7 +143,7 @@ def get_TStar_search_results(args, data_item,
         "video_path": data_item['video_path'],
         "grounding_objects": {"target_objects": target_objects, "cue_objects": cue_objects},
         "keyframe_timestamps": time_stamps,
-        "keyframe_distribution": video_searcher.P_history[-1]
+        "keyframe_distribution": video_searcher.P_history[-1].tolist()
     }
 
     return result
@@ -173,6 +176,8 @@ def main():
     parser.add_argument('--grid_cols', type=int, default=4, help='Number of columns in the image grid.')
     parser.add_argument('--confidence_threshold', type=float, default=0.7, help='YOLO detection confidence threshold.')
     parser.add_argument('--search_budget', type=float, default=1.0, help='Maximum ratio of frames to process during search.')
+    parser.add_argument('--batch_size', type=int, default=1, help='Image grids sampled and scored per search iteration (one detector forward pass). Not just a throughput knob: the sampling distribution is updated once per batch and each iteration spends grid_rows*grid_cols*batch_size frames of the budget.')
+    parser.add_argument('--iterations_format', type=str, default='gif', choices=['gif', 'mp4'], help='Format of the saved search-iteration recordings.')
     parser.add_argument('--output_dir', type=str, default='./results/frame_search', help='Directory to save outputs.')
 
     args = parser.parse_args()
@@ -185,9 +190,13 @@ def main():
     os.makedirs(args.output_dir, exist_ok=True)
 
     # Initialize Search tools
-    grounder = TStarUniversalGrounder(model_name=args.grounder)
+    grounder = TStarUniversalGrounder(
+        model_name=args.grounder,
+        cache_dir=os.path.join(args.output_dir, "grounder_cache")  # reruns skip already-grounded queries
+    )
     TStarHeuristic = initialize_heuristic(
-        heuristic_type=args.heuristic
+        heuristic_type=args.heuristic,
+        batch_size=args.batch_size
     )
 
     results = []
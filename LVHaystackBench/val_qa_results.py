@@ -9,6 +9,7 @@ from PIL import Image
 from tqdm import tqdm
 
 from TStar.interface_grounding import TStarUniversalGrounder
+from TStar.utilites import read_frames_sequential
 
 # Configure logging
 logging.basicConfig(
@@ -117,11 +118,11 @@ def extract_frames(
     frame_indices = [min(max(0, idx), total_frames - 1) for idx in frame_indices]
 
     # --- Frame extraction ---
+    frames_by_index = read_frames_sequential(cap, frame_indices)
     frames = []
     for idx in frame_indices:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-        ret, frame = cap.read()
-        if ret:
+        frame = frames_by_index.get(idx)
+        if frame is not None:
             frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             frames.append(Image.fromarray(frame_rgb))
         else:
@@ -113,6 +113,36 @@ def load_video_fps(video_path: str) -> float:
     logger.debug(f"Video FPS for {video_path}: {fps}")
     return fps
 
+def read_frames_sequential(cap: cv2.VideoCapture, frame_indices: List[int], max_grab_gap: int = 300) -> Dict[int, np.ndarray]:
+    """
+    Read the requested frames in one ascending pass, grabbing over short gaps and
+    seeking only across gaps larger than `max_grab_gap` frames.
+
+    Mirrors TStar.utilites.read_frames_sequential; kept local so this script only
+    depends on the packages listed in its header.
+
+    Returns:
+        Dict mapping each successfully read frame index to its BGR frame.
+    """
+    frames = {}
+    # Index the next read returns; None if unknown (some backends report -1), which forces a seek
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if position < 0:
+        position = None
+    for idx in sorted(set(frame_indices)):
+        if position is None or idx < position or idx - position > max_grab_gap:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            position = idx
+        while position < idx and cap.grab():
+            position += 1
+        ret, frame = cap.read() if position == idx else (False, None)
+        if ret:
+            frames[idx] = frame
+            position += 1
+        else:
+            position = None
+    return frames
+
 def extract_frames(video_path: str, frame_indices: List[int]) -> List[np.ndarray]:
     """
     Extract specified frames from a video.
@@ -130,11 +160,11 @@ def extract_frames(video_path: str, frame_indices: List[int]) -> List[np.ndarray
         logger.error(f"Cannot open video file: {video_path}")
         raise ValueError(f"Cannot open video file: {video_path}")
 
+    frames_by_index = read_frames_sequential(cap, frame_indices)
     frames = []
     for idx in frame_indices:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-        ret, frame = cap.read()
-        if ret:
+        frame = frames_by_index.get(idx)
+        if frame is not None:
             frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             frames.append(frame_rgb)
             logger.debug(f"Extracted frame {idx} from {video_path}")
@@ -3,11 +3,12 @@ import sys
 import cv2
 import logging
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 from TStar.interface_grounding import TStarUniversalGrounder
 from TStar.interface_heuristic import YoloWorldInterface, OWLInterface, HeuristicInterface
 from TStar.interface_searcher import TStarSearcher
-from TStar.utilites import save_as_gif
+from TStar.utilites import VideoHandle, configure_opencv, save_as_gif, save_as_mp4
 
 
 # Configure logging
@@ -18,6 +19,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Enable OpenCV's SIMD paths and size its thread pool for the preprocessing/encoding work
+configure_opencv()
+
 class TStarFramework:
     """
     Main class for performing object-based frame search and question-answering in a video.
@@ -35,7 +39,9 @@ class TStarFramework:
         grid_cols: int = 4,
         output_dir: str = './output',
         confidence_threshold: float = 0.6,
-        search_budget: int = 1000
+        search_budget: int = 1000,
+        batch_size: int = 1,
+        iterations_format: str = "gif"
     ):
         self.video_path = video_path
         self.grounder = grounder
@@ -45,11 +51,21 @@ class TStarFramework:
         self.search_nframes = search_nframes
         self.grid_rows = grid_rows
         self.grid_cols = grid_cols
-        self.output_dir = os.path.join(output_dir, os.path.basename(video_path).split('.')[0], question[:-1])
+        self.video_id = os.path.basename(video_path).split('.')[0]
+        self.output_dir = os.path.join(output_dir, self.video_id, question[:-1])
         self.confidence_threshold = confidence_threshold
         self.search_budget = search_budget
+        self.batch_size = batch_size
+        self.iterations_format = iterations_format  # 'gif' or 'mp4' for the search-iteration recordings
         self._create_output_dir()
 
+        # Grounding and search read the same video, so they share one lazily opened reader
+        self.video = VideoHandle(video_path)
+
+        # Output paths are fixed per video/question, so build them once
+        self.frame_dir = os.path.join(self.output_dir, "frames")
+        self.score_plot_path = os.path.join(self.output_dir, "score_distribution.png")
+
         self.results = {} # to store search results, e.g., grounding, frames
 
     def _create_output_dir(self):
@@ -62,9 +78,10 @@ class TStarFramework:
         """
         Run the TStar framework to search for objects and answer questions.
         """
-        target_objects, cue_objects = self.get_grounded_objects()
-        video_searcher = self.initialize_videoSearcher(target_objects, cue_objects)
-        all_frames, time_stamps = self.perform_search(video_searcher, visualization=True)
+        with self.video:
+            target_objects, cue_objects = self.get_grounded_objects()
+            video_searcher = self.initialize_videoSearcher(target_objects, cue_objects)
+            all_frames, time_stamps = self.perform_search(video_searcher, visualization=True)
         answer = self.perform_qa(all_frames)
         logger.info(f"Answer: {answer}")
         
@@ -81,7 +98,8 @@ class TStarFramework:
         target_objects, cue_objects = self.grounder.inference_query_grounding(
             video_path=self.video_path,
             question=self.question,
-            options=self.options
+            options=self.options,
+            video=self.video
         )
         self.results["Grounding Objects"] = {"target_objects": target_objects, "cue_objects":cue_objects}
         logger.info(f"Target objects: {target_objects}")
@@ -103,7 +121,9 @@ class TStarFramework:
             output_dir=self.output_dir,
             confidence_threshold=self.confidence_threshold,
             search_budget=self.search_budget,
-            heuristic=self.heuristic
+            heuristic=self.heuristic,
+            batch_size=self.batch_size,
+            video=self.video
         )
 
         return videoSearcher
@@ -114,9 +134,15 @@ class TStarFramework:
         """
         if visualization:
             all_frames, time_stamps = video_searcher.search()
-            self._save_frames(all_frames, time_stamps)
-            self._save_searching_iterations(video_searcher)
-            self._plot_and_save_scores(video_searcher)
+            # Frame/GIF encoding (OpenCV, PIL) runs on worker threads while matplotlib stays on this thread
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    executor.submit(self._save_frames, all_frames, time_stamps),
+                    executor.submit(self._save_searching_iterations, video_searcher),
+                ]
+                self._plot_and_save_scores(video_searcher)
+                for future in futures:
+                    future.result()
         else:
             all_frames, time_stamps = video_searcher.search()
         
@@ -137,55 +163,85 @@ class TStarFramework:
         """
         Save the relevant frames as image files.
         """
-        frame_dir = os.path.join(self.output_dir, "frames")
-        os.makedirs(frame_dir, exist_ok=True)
+        os.makedirs(self.frame_dir, exist_ok=True)
+
+        # Convert the whole RGB batch to BGR in one pass instead of one allocation per frame
+        frames_bgr = np.ascontiguousarray(np.asarray(frames)[..., ::-1])
+        frame_paths = [
+            os.path.join(self.frame_dir, f"frame_{idx}_at_{timestamp:.2f}s.jpg")
+            for idx, timestamp in enumerate(timestamps)
+        ]
+
+        def encode_and_write(frame: np.ndarray, frame_path: str):
+            # cv2 releases the GIL while encoding, so frames are encoded and written in parallel
+            ok, buffer = cv2.imencode(".jpg", frame)
+            if not ok:
+                raise ValueError(f"Failed to encode frame for {frame_path}")
+            with open(frame_path, "wb") as f:
+                f.write(buffer)
+            logger.debug(f"Saved frame to {frame_path}")
 
-        for idx, (frame, timestamp) in enumerate(zip(frames, timestamps)):
-            frame_path = os.path.join(frame_dir, f"frame_{idx}_at_{timestamp:.2f}s.jpg")
-            cv2.imwrite(frame_path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-            logger.info(f"Saved frame to {frame_path}")
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(frame_paths)))) as executor:
+            list(executor.map(encode_and_write, frames_bgr, frame_paths))
+        logger.info(f"Saved {len(frame_paths)} frames to {self.frame_dir}")
 
     def _save_searching_iterations(self, video_searcher: TStarSearcher):
         """
         Save the frames and their annotations from search iterations.
         """
-        image_grid_iters = video_searcher.image_grid_iters
         detect_annotot_iters = video_searcher.detect_annotot_iters
-        
-        for b in range(len(image_grid_iters[0])):
-            images = [image_grid_iter[b] for image_grid_iter in image_grid_iters]
-            anno_images = [detect_annotot_iter[b] for detect_annotot_iter in detect_annotot_iters]
-            output_video_path = os.path.join(self.output_dir, f"search_iterations.gif")
-            save_as_gif(images=anno_images, output_gif_path=output_video_path)
-            logger.info(f"Saved search iterations GIF to {output_video_path}")
+        num_slots = len(detect_annotot_iters[0])
+        output_paths = [
+            os.path.join(self.output_dir, "search_iterations" if b == 0 else f"search_iterations_{b}")
+            for b in range(num_slots)
+        ]
+
+        # Gather each batch slot's annotated frames in one pass over the iterations.
+        # Verification iterations hold a single image, so they only extend slot 0.
+        anno_images_per_slot = [[] for _ in range(num_slots)]
+        for detect_annotot_iter in detect_annotot_iters:
+            for b, anno_image in enumerate(detect_annotot_iter):
+                anno_images_per_slot[b].append(anno_image)
+
+        for anno_images, output_path in zip(anno_images_per_slot, output_paths):
+            if self.iterations_format == "mp4":
+                if save_as_mp4(images=anno_images, output_video_path=f"{output_path}.mp4"):
+                    logger.info(f"Saved search iterations video to {output_path}.mp4")
+                    continue
+                logger.warning("No MP4 encoder available in this OpenCV build, falling back to GIF.")
+            save_as_gif(images=anno_images, output_gif_path=f"{output_path}.gif")
+            logger.info(f"Saved search iterations GIF to {output_path}.gif")
 
     def _plot_and_save_scores(self, video_searcher: TStarSearcher):
         """
         Plot and save the score distribution from the search process.
         """
-        plot_path = os.path.join(self.output_dir, "score_distribution.png")
-        video_searcher.plot_score_distribution(save_path=plot_path)
-        logger.info(f"Score distribution plot saved to {plot_path}")
+        video_searcher.plot_score_distribution(save_path=self.score_plot_path)
+        logger.info(f"Score distribution plot saved to {self.score_plot_path}")
 
 
-def initialize_heuristic(heuristic_type: str = "owl-vit") -> HeuristicInterface:
+def initialize_heuristic(heuristic_type: str = "owl-vit", dtype: str = "fp16", batch_size: int = 1) -> HeuristicInterface:
     """
     Initialize the object detection model based on the selected heuristic type.
+
+    `dtype` selects the inference precision ('fp16' autocast or 'fp32'); fp16 falls back to fp32 on CPU.
+    The model is warmed up at `batch_size` so the first search iteration does not pay the cold-start cost.
     """
     if heuristic_type == 'owl-vit':
         model_name = "google/owlvit-base-patch32"
-        owl_interface = OWLInterface(model_name_or_path=model_name)
+        heuristic = OWLInterface(model_name_or_path=model_name, dtype=dtype)
         logger.info("OWLInterface initialized successfully.")
-        return owl_interface
     elif heuristic_type == 'yolo-World':
         config_path = "./YOLO-World/configs/pretrain/yolo_world_v2_xl_vlpan_bn_2e-3_100e_4x8gpus_obj365v1_goldg_train_lvis_minival.py"
         checkpoint_path = "./pretrained/YOLO-World/yolo_world_v2_xl_obj365v1_goldg_cc3mlite_pretrain-5daf1395.pth"
-        yolo_interface = YoloWorldInterface(config_path=config_path, checkpoint_path=checkpoint_path)
+        heuristic = YoloWorldInterface(config_path=config_path, checkpoint_path=checkpoint_path, dtype=dtype)
         logger.info("YoloWorldInterface initialized successfully.")
-        return yolo_interface
     else:
         raise NotImplementedError(f"Heuristic type '{heuristic_type}' is not implemented.")
 
+    heuristic.warmup(batch_sizes=sorted({1, batch_size}))
+    return heuristic
+
 
 def run_tstar(
     video_path: str,
@@ -198,13 +254,15 @@ def run_tstar(
     grid_cols: int = 4,
     confidence_threshold: float = 0.6,
     search_budget: float = 0.5,
-    output_dir: str = './output'
+    output_dir: str = './output',
+    batch_size: int = 1,
+    iterations_format: str = "gif"
 ):
     """
     Execute the TStar video frame search and question-answering process.
     """
     grounder = TStarUniversalGrounder(model_name=grounder)
-    heuristic = initialize_heuristic(heuristic)
+    heuristic = initialize_heuristic(heuristic, batch_size=batch_size)
 
     TStarQA = TStarFramework(
         video_path=video_path,
@@ -217,7 +275,9 @@ def run_tstar(
         grid_cols=grid_cols,
         output_dir=output_dir,
         confidence_threshold=confidence_threshold,
-        search_budget=search_budget
+        search_budget=search_budget,
+        batch_size=batch_size,
+        iterations_format=iterations_format
     )
 
     return TStarQA.run()
@@ -1,4 +1,7 @@
 import os
+import json
+import hashlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Optional, List
 import openai
 from PIL import Image
@@ -6,7 +9,7 @@ import re
 # It is assumed that TStar.utilites defines the following functions:
 # - encode_image_to_base64: converts a PIL.Image to a base64 string.
 # - load_video_frames: loads a specified number of frames from a video.
-from TStar.utilites import encode_image_to_base64, load_video_frames
+from TStar.utilites import VideoHandle, encode_image_to_base64, load_video_frames
 
 
 class LlavaInterface:
@@ -43,12 +46,6 @@ class LlavaInterface:
         # In a real scenario, call the Llava model for inference.
         return "Fake Response from LlavaInterface"
 
-from typing import List, Optional
-import torch
-from PIL import Image
-from transformers import Qwen2_5_VLForConditionalGeneration, AutoProcessor
-from qwen_vl_utils import process_vision_info
-
 class QwenInterface:
     def __init__(
         self,
@@ -58,7 +55,9 @@ class QwenInterface:
         """
         Initialize Qwen model and processor.
         """
-        
+        # Imported here so the GPT and Llava backends do not load transformers' Qwen model code
+        from transformers import Qwen2_5_VLForConditionalGeneration, AutoProcessor
+
         self.model = Qwen2_5_VLForConditionalGeneration.from_pretrained(
             model_name, torch_dtype="auto", device_map="auto"
         )
@@ -169,14 +168,26 @@ class GPT4Interface:
             {"role": "user", "content": user_content},
         ]
 
+    def _encode_frames_concurrently(self, frames: List[Image.Image]) -> List[Future]:
+        """
+        Base64-encode frames on a thread pool; JPEG encoding releases the GIL.
+
+        Returns one completed future per frame, so callers can report errors per frame index.
+        """
+        if not frames:
+            return []
+        with ThreadPoolExecutor(max_workers=min(8, len(frames))) as executor:
+            return [executor.submit(encode_image_to_base64, frame) for frame in frames]
+
     def _encode_frames(self, frames: List[Image.Image]) -> List[Dict]:
         """
         Encode image frames into Base64 formatted messages.
         """
         messages = []
-        for i, frame in enumerate(frames):
+        futures = self._encode_frames_concurrently(frames)
+        for i, future in enumerate(futures):
             try:
-                frame_base64 = encode_image_to_base64(frame)
+                frame_base64 = future.result()
                 visual_context = {
                     "type": "image_url",
                     "image_url": {
@@ -294,13 +305,15 @@ class GPT4Interface:
         The query may include <image> tags.
         """
         parts = query.split("<image>")
+        # Encode every frame that has an <image> slot up front, then interleave with the text
+        frame_futures = self._encode_frames_concurrently(frames[:len(parts)])
         user_content = []
         for i, part in enumerate(parts):
             if part.strip():
                 user_content.append({"type": "text", "text": part.strip()})
-            if i < len(frames):
+            if i < len(frame_futures):
                 try:
-                    frame_base64 = encode_image_to_base64(frames[i])
+                    frame_base64 = frame_futures[i].result()
                     visual_context = {
                         "type": "image_url",
                         "image_url": {
@@ -336,9 +349,15 @@ class TStarUniversalGrounder:
         model_base: Optional[str] = None,
         gpt4_api_key: Optional[str] = None,
         num_frames: Optional[int] = 8,
+        cache_dir: Optional[str] = None,
     ):
         self.backend = model_name.lower()
         self.num_frames = num_frames
+        # Query-grounding results are memoized in memory and, if cache_dir is given, on disk
+        self.cache_dir = cache_dir
+        self._grounding_cache = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
         if "llava" in self.backend:
             if not model_path:
                 raise ValueError("Please provide model_path for LlavaInterface")
@@ -357,7 +376,8 @@ class TStarUniversalGrounder:
         question: str,
         options: Optional[str] = None,
         temperature: float = 0.0,
-        max_tokens: int = 512
+        max_tokens: int = 512,
+        video: Optional[VideoHandle] = None
     ) -> Dict[str, List[str]]:
         """
         Identify target objects and cue objects from the video based on the question.
@@ -366,11 +386,21 @@ class TStarUniversalGrounder:
             video_path: Path to the video file.
             question: The question.
             options: (Optional) multiple-choice options.
+            video: (Optional) already opened handle for video_path to read frames from.
         
         Returns:
             A dictionary with two keys: target_objects and cue_objects.
         """
-        frames = load_video_frames(video_path=video_path, num_frames=self.num_frames)
+        # Only deterministic requests are memoized; sampled ones are expected to vary
+        cache_key = None
+        if temperature == 0.0:
+            cache_key = self._grounding_cache_key(video_path, question, options, max_tokens)
+            cached = self._load_cached_grounding(cache_key)
+            if cached is not None:
+                target_objects, cue_objects = cached
+                return list(target_objects), list(cue_objects)
+
+        frames = load_video_frames(video_path=video_path, num_frames=self.num_frames, video=video)
         system_prompt = (
             "Here is a video:\n" + "\n".join(["<image>"] * len(frames)) +
             "\nHere is a question about the video:\n" +
@@ -396,8 +426,64 @@ class TStarUniversalGrounder:
 
         target_objects = [self.check_objects_str(obj) for obj in lines[0].split(",") if obj.strip()]
         cue_objects = [self.check_objects_str(obj) for obj in lines[1].split(",") if obj.strip()]
+        if cache_key is not None:
+            self._store_cached_grounding(cache_key, target_objects, cue_objects)
         return target_objects, cue_objects
 
+    def _grounding_cache_key(
+        self,
+        video_path: str,
+        question: str,
+        options: Optional[str],
+        max_tokens: int
+    ) -> str:
+        """
+        Build the cache key for a grounding request. The video's modification time is
+        part of the key, so replacing the file invalidates its cached results.
+        """
+        try:
+            mtime = os.path.getmtime(video_path)
+        except OSError:
+            mtime = None
+        payload = json.dumps(
+            [self.backend, self.num_frames, os.path.abspath(video_path), mtime, question, options, max_tokens]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load_cached_grounding(self, cache_key: str):
+        """
+        Look up a grounding result in memory, then in the on-disk cache.
+        """
+        if cache_key in self._grounding_cache:
+            return self._grounding_cache[cache_key]
+        if not self.cache_dir:
+            return None
+        cache_path = os.path.join(self.cache_dir, f"{cache_key}.json")
+        try:
+            with open(cache_path, "r") as f:
+                entry = json.load(f)
+            result = (entry["target_objects"], entry["cue_objects"])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable or malformed entries are treated as a cache miss
+            return None
+        if not all(isinstance(objects, list) for objects in result):
+            return None
+        self._grounding_cache[cache_key] = result
+        return result
+
+    def _store_cached_grounding(self, cache_key: str, target_objects: List[str], cue_objects: List[str]):
+        """
+        Store a grounding result in memory and, if enabled, on disk.
+        """
+        self._grounding_cache[cache_key] = (list(target_objects), list(cue_objects))
+        if not self.cache_dir:
+            return
+        cache_path = os.path.join(self.cache_dir, f"{cache_key}.json")
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"target_objects": target_objects, "cue_objects": cue_objects}, f)
+        os.replace(tmp_path, cache_path)  # atomic, so concurrent readers never see a partial file
+
     def check_objects_str(self, obj: str) -> str:
         """
         Process the object string to normalize object names by:
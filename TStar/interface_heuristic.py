@@ -2,6 +2,7 @@ import os.path as osp
 from mmengine.config import Config
 from mmengine.dataset import Compose
 from mmdet.apis import init_detector # only for yoloworld interface
+from mmcv.cnn import fuse_conv_bn as mmcv_fuse_conv_bn
 from torch.amp import autocast
 import torch
 import supervision as sv
@@ -23,7 +24,6 @@ class LabelAnnotator(sv.LabelAnnotator):
         text_w, text_h = text_wh
         return center_x, center_y, center_x + text_w, center_y + text_h
 
-import torch.nn as nn
 
 class HeuristicInterface:
     def __init__(self, heuristic_type: str = "owl-vit", **kwargs):
@@ -36,8 +36,43 @@ class HeuristicInterface:
             device (str): Device to run the model on (e.g., 'cuda:0', 'cpu').
         """
 
+    def set_precision(self, dtype: str, device: str):
+        """
+        Configure the inference precision of the detector.
+
+        Args:
+            dtype (str): 'fp32', or 'fp16' to run forward passes under CUDA autocast.
+            device (str): Device the model runs on; autocast is only enabled on CUDA.
+        """
+        if dtype not in ("fp32", "fp16"):
+            raise ValueError(f"Unsupported dtype '{dtype}', expected 'fp32' or 'fp16'.")
+        self.dtype = dtype
+        self.use_amp = dtype == "fp16" and torch.device(device).type == "cuda"
+
+    def warmup(self, batch_sizes=(1,), image_shape=(380, 800, 3), iters: int = 2):
+        """
+        Run dummy detections so cuDNN autotuning and CUDA allocations happen before the first search.
+
+        Args:
+            batch_sizes (tuple): Batch sizes to warm up; each shape is autotuned separately.
+            image_shape (tuple): HWC shape of the dummy images (defaults to a 4x4 search grid).
+            iters (int): Number of forward passes per batch size.
+        """
+        if torch.device(self.device).type != "cuda":
+            return
+        torch.backends.cudnn.benchmark = True
+        if not hasattr(self, "texts"):
+            # YOLO-World needs a text vocabulary before it can run; the searcher reparameterizes it later
+            self.reparameterize_object_list(["object"], [])
+        for batch_size in batch_sizes:
+            images = [np.zeros(image_shape, dtype=np.uint8)] * batch_size
+            for _ in range(iters):
+                self.inference_detector(images=images)
+        torch.cuda.synchronize(self.device)
+
 class YoloWorldInterface(HeuristicInterface):
-    def __init__(self, config_path: str, checkpoint_path: str, device: str = "cuda:0"):
+    def __init__(self, config_path: str, checkpoint_path: str, device: str = "cuda:0", dtype: str = "fp32",
+                 fuse_conv_bn: bool = True):
         """
         Initialize the YOLO-World model with the given configuration and checkpoint.
 
@@ -45,10 +80,13 @@ class YoloWorldInterface(HeuristicInterface):
             config_path (str): Path to the model configuration file.
             checkpoint_path (str): Path to the model checkpoint.
             device (str): Device to run the model on (e.g., 'cuda:0', 'cpu').
+            dtype (str): Inference precision, 'fp32' or 'fp16' (falls back to fp32 on CPU).
+            fuse_conv_bn (bool): Fold BatchNorm layers into the preceding convolutions for inference.
         """
         self.config_path = config_path
         self.checkpoint_path = checkpoint_path
         self.device = device
+        self.set_precision(dtype, device)
 
         # Load configuration
         cfg = Config.fromfile(config_path)
@@ -57,6 +95,9 @@ class YoloWorldInterface(HeuristicInterface):
 
         # Initialize the model
         self.model = init_detector(cfg, checkpoint=checkpoint_path, device=device)
+        if fuse_conv_bn:
+            # Inference-only: BN statistics are frozen, so conv+bn collapses into a single conv
+            self.model = mmcv_fuse_conv_bn(self.model)
         self.set_BBoxAnnotator()
 
         # Initialize the test pipeline
@@ -64,6 +105,12 @@ class YoloWorldInterface(HeuristicInterface):
         self.model.cfg.test_dataloader.dataset.pipeline[
             0].type = 'mmdet.LoadImageFromNDArray'
         self.test_pipeline = Compose(self.model.cfg.test_dataloader.dataset.pipeline)
+
+        # Batches are staged in page-locked memory so the data preprocessor's H2D copy can run asynchronously
+        self.pin_memory = torch.device(device).type == "cuda"
+        self._pinned_inputs = None
+        if self.pin_memory:
+            self.model.data_preprocessor._non_blocking = True
     
     def set_BBoxAnnotator(self):
         self.BOUNDING_BOX_ANNOTATOR = sv.BoundingBoxAnnotator(thickness=1)
@@ -134,12 +181,14 @@ class YoloWorldInterface(HeuristicInterface):
         return detections
     
     def inference_detector(self, images, max_dets=50, score_threshold=0.12, use_amp: bool = False):
-        data_info = dict(img_id=0, img=images[0], texts=self.texts) #TBD for batch searching
-        data_info = self.test_pipeline(data_info)
-        data_batch = dict(inputs=data_info['inputs'].unsqueeze(0),
-                        data_samples=[data_info['data_samples']])
+        # Run the whole batch of images through the detector in one forward pass
+        data_infos = [self.test_pipeline(dict(img_id=i, img=image, texts=self.texts))
+                      for i, image in enumerate(images)]
+        data_batch = dict(inputs=self._stack_inputs([data_info['inputs'] for data_info in data_infos]),
+                        data_samples=[data_info['data_samples'] for data_info in data_infos])
         detections_inbatch = []
-        with torch.no_grad():
+        use_amp = (use_amp or self.use_amp) and torch.device(self.device).type == "cuda"
+        with autocast("cuda", dtype=torch.float16, enabled=use_amp), torch.inference_mode():
             outputs = self.model.test_step(data_batch)
             # cover to searcher interface format
             
@@ -167,6 +216,23 @@ class YoloWorldInterface(HeuristicInterface):
         self.detections_inbatch = detections_inbatch
         return detections_inbatch
 
+    def _stack_inputs(self, inputs: List[torch.Tensor]) -> torch.Tensor:
+        """
+        Stack per-image pipeline outputs into one batch tensor.
+
+        On CUDA the batch is written into a reusable pinned buffer, which is only
+        reallocated when the batch grows or the input shape changes.
+        """
+        if not self.pin_memory:
+            return torch.stack(inputs)
+        shape = (len(inputs),) + tuple(inputs[0].shape)
+        if (self._pinned_inputs is None
+                or self._pinned_inputs.shape[0] < shape[0]
+                or self._pinned_inputs.shape[1:] != shape[1:]
+                or self._pinned_inputs.dtype != inputs[0].dtype):
+            self._pinned_inputs = torch.empty(shape, dtype=inputs[0].dtype, pin_memory=True)
+        return torch.stack(inputs, out=self._pinned_inputs[:shape[0]])
+
     def bbox_visualization(self, images, detections_inbatch):
         anno_images = []
         # detections_inbatch = self.detections_inbatch
@@ -177,9 +243,7 @@ class YoloWorldInterface(HeuristicInterface):
                 zip(detections.class_id, detections.confidence)
             ]
 
-        
-            index = len(detections_inbatch) -1 
-            image = images[index]
+            image = images[b]
             anno_image = image.copy()
   
     
@@ -198,11 +262,16 @@ import numpy as np
 
 
 class OWLInterface(HeuristicInterface):
-    def __init__(self, model_name_or_path: str, device: str = "cuda"):
+    def __init__(self, model_name_or_path: str, device: str = "cuda", dtype: str = "fp32"):
         self.processor, self.model = self.load_model_and_tokenizer(model_name_or_path)
-        self.texts = ["couch", "table", "woman"] #TODO MV
+        self.texts = [["couch"], ["table"], ["woman"]] #TODO MV
         self.device = device
         self.model = self.model.to(self.device)
+        self.set_precision(dtype, device)
+        self.set_BBoxAnnotator()
+
+    def set_BBoxAnnotator(self):
+        self.BOUNDING_BOX_ANNOTATOR = sv.BoxAnnotator()
 
     def load_model_and_tokenizer(self, model_name):
         processor = OwlViTProcessor.from_pretrained(model_name)
@@ -210,7 +279,7 @@ class OWLInterface(HeuristicInterface):
         return processor, model
 
     def forward_model(self, inputs):
-        with torch.no_grad():
+        with autocast("cuda", dtype=torch.float16, enabled=self.use_amp), torch.no_grad():
             outputs = self.model(**inputs)
         return outputs
 
@@ -231,10 +300,12 @@ class OWLInterface(HeuristicInterface):
     
     def inference_detector(self, images, **kwargs):
         batch_images = np.array(images)
-        inputs = self.processor(text= self.texts, images=batch_images[0], return_tensors="pt").to(self.device)
+        # Every image in the batch is queried with the same object list
+        queries = [text[0] for text in self.texts]
+        inputs = self.processor(text=[queries] * len(batch_images), images=list(batch_images), return_tensors="pt").to(self.device)
         height, width = batch_images[0].shape[:2]
         detections_inbatch = []
-        with torch.no_grad():
+        with torch.inference_mode():
             # Run model inference 
             outputs = self.forward_model(inputs)
 
@@ -245,22 +316,14 @@ class OWLInterface(HeuristicInterface):
             detections = sv.Detections.from_transformers(transformers_results=result)
             detections_inbatch.append(detections)
 
-        check = True
-        if check:
-            # save first image for checking
-            bounding_box_annotator = sv.BoxAnnotator()
-            annotated_image = bounding_box_annotator.annotate(batch_images[0] , detections_inbatch[0])
-
-            output_image = Image.fromarray(annotated_image[:, :, ::-1])
-            output_image.save("./annotated_image.png")
-            self.detections_inbatch = detections_inbatch
+        # Annotated images are rendered on demand by bbox_visualization; nothing is written to disk here
+        self.detections_inbatch = detections_inbatch
         return detections_inbatch
 
     def bbox_visualization(self, images, detections_inbatch):
-        bounding_box_annotator = sv.BoxAnnotator()
         annotated_images = []
         for image, detections in zip(images,detections_inbatch):
-            annotated_image = bounding_box_annotator.annotate(image, detections)
+            annotated_image = self.BOUNDING_BOX_ANNOTATOR.annotate(image, detections)
             # output_image = Image.fromarray(annotated_image[:, :, ::-1])
             annotated_images.append(annotated_image)
             
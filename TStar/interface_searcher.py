@@ -1,14 +1,35 @@
-import copy
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 from decord import VideoReader, cpu
-from scipy.interpolate import UnivariateSpline
 from tqdm import tqdm
 
 # Import the YOLO interface and HeuristicInterface from TStar package
-from TStar.interface_heuristic import YoloWorldInterface, HeuristicInterface
+from TStar.interface_heuristic import HeuristicInterface
+from TStar.utilites import VideoHandle
+
+
+def _weighted_topk(p: np.ndarray, k: int) -> np.ndarray:
+    """
+    Draw `k` distinct indices with probability proportional to `p` (Gumbel-top-k).
+
+    Equivalent in distribution to `np.random.choice(len(p), k, replace=False, p=p)`,
+    but done in one vectorized pass and `p` does not need to be normalized.
+
+    Args:
+        p (np.ndarray): Non-negative weights.
+        k (int): Number of indices to draw.
+
+    Returns:
+        np.ndarray: The sampled indices (unordered).
+    """
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    with np.errstate(divide="ignore"):
+        keys = np.log(p) + np.random.gumbel(size=p.shape)
+    return np.argpartition(keys, -k)[-k:]
 
 
 class TStarSearcher:
@@ -30,6 +51,8 @@ class TStarSearcher:
         output_dir: Optional[str] = None,
         confidence_threshold: float = 0.5,
         object2weight: Optional[dict] = None,
+        batch_size: int = 1,
+        video: Optional[VideoHandle] = None,
     ):
         """
         Initialize TStarSearcher with video properties and configuration.
@@ -45,6 +68,11 @@ class TStarSearcher:
             output_dir (Optional[str]): Directory for saving outputs.
             confidence_threshold (float): Detection confidence threshold.
             object2weight (Optional[dict]): Mapping of object names to their detection weights.
+            batch_size (int): Number of image grids sampled and scored per search iteration
+                (one detector forward pass). This also changes the search itself: the
+                distribution is only updated after all `batch_size` grids are scored, and
+                each iteration spends rows * cols * batch_size frames of the budget.
+            video (Optional[VideoHandle]): Already opened handle for `video_path` to share.
         """
         self.video_path = video_path
         self.target_objects = target_objects
@@ -54,14 +82,13 @@ class TStarSearcher:
         self.output_dir = output_dir
         self.confidence_threshold = confidence_threshold
         self.object2weight = object2weight if object2weight else {}
+        self.batch_size = max(1, batch_size)
         self.fps = 1  # Sampling rate: 1 frame per second
 
-        # Video properties
-        cap = cv2.VideoCapture(self.video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Cannot open video file: {self.video_path}")
-        self.raw_fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        # Video properties, read from the same decord reader that decodes the frames
+        self.video = video if video is not None else VideoHandle(video_path)
+        self.raw_fps = self.video.fps
+        total_frames = self.video.total_frames
         self.duration = total_frames / self.raw_fps
 
         # Adjust total frame number based on sampling rate
@@ -70,17 +97,24 @@ class TStarSearcher:
         self.search_budget = min(1000, self.total_frame_num * search_budget)
 
         # Initialize distributions and histories
-        self.score_distribution = np.zeros(self.total_frame_num) + 1e-6  # a small constant
+        self.score_distribution = np.full(self.total_frame_num, 1e-6)  # a small constant
         self.non_visiting_frames = np.ones(self.total_frame_num)
-        self.P = np.ones(self.total_frame_num) * self.confidence_threshold * 0.3
+        self.P = np.full(self.total_frame_num, self.confidence_threshold * 0.3)
 
+        # Histories hold one ndarray row per iteration; np.stack gives an (iters, total_frame_num) matrix
         self.P_history = []
         self.Score_history = []
         self.non_visiting_history = []
         self.image_grid_iters = []      # List of image grid iterations
         self.detect_annotot_iters = []  # List of annotated image iterations
         self.detect_bbox_iters = []     # List of bbox detections per iteration
+        self.detections_inbatch = []    # Detections from the latest scoring call
+        self._annotation_executor = None  # Background worker for detect_annotot_iters
+        self._pending_annotations = []
 
+        # Video decoding: an LRU cache holding one iteration's worth of frames
+        self._frame_cache = OrderedDict()
+        self._frame_cache_size = image_grid_shape[0] * image_grid_shape[1] * self.batch_size
 
         # Set YOLO interface (heuristic)
         self.heuristic = heuristic
@@ -119,45 +153,60 @@ class TStarSearcher:
 
         confidence_maps = []
         detected_objects_maps = []
+        self.detections_inbatch = []  # raw detections for every scored image, in input order
 
-        for image in images:
-            detections = self.heuristic.inference_detector(
-                images=[image],
+        # Class names and weights depend only on the detector vocabulary, so look them up once
+        object_names = [text[0] for text in self.heuristic.texts]
+        class_weights = np.array([self.object2weight.get(name, 0.5) for name in object_names])
+
+        # Score up to `batch_size` images per detector forward pass
+        for start in range(0, len(images), self.batch_size):
+            detections_inbatch = self.heuristic.inference_detector(
+                images=images[start:start + self.batch_size],
                 use_amp=False
             )
+            self.detections_inbatch.extend(detections_inbatch)
 
-            # Initialize map for each grid cell
-            confidence_map = np.zeros((grid_rows, grid_cols))
-            detected_objects_map = [[] for _ in range(grid_rows * grid_cols)]
-
-            for detection in detections:
-                for bbox, label, confidence in zip(detection.xyxy, detection.class_id, detection.confidence):
-                    object_name = self.heuristic.texts[label][0]  # Map class id to name
-                    weight = self.object2weight.get(object_name, 0.5)
-                    adjusted_confidence = confidence * weight
+            for detection in detections_inbatch:
+                # Initialize map for each grid cell
+                confidence_map = np.zeros((grid_rows, grid_cols))
+                detected_objects_map = [[] for _ in range(grid_rows * grid_cols)]
 
-                    x_min, y_min, x_max, y_max = bbox
-                    box_center_x = (x_min + x_max) / 2
-                    box_center_y = (y_min + y_max) / 2
+                if len(detection.xyxy) > 0:
+                    # Map every box center to its grid cell at once
+                    xyxy = np.asarray(detection.xyxy)
+                    class_ids = np.asarray(detection.class_id)
+                    adjusted_confidences = np.asarray(detection.confidence) * class_weights[class_ids]
 
-                    grid_x = int(box_center_x // grid_width)
-                    grid_y = int(box_center_y // grid_height)
-                    grid_x = min(grid_x, grid_cols - 1)
-                    grid_y = min(grid_y, grid_rows - 1)
+                    grid_x = np.minimum(((xyxy[:, 0] + xyxy[:, 2]) / 2 // grid_width).astype(int), grid_cols - 1)
+                    grid_y = np.minimum(((xyxy[:, 1] + xyxy[:, 3]) / 2 // grid_height).astype(int), grid_rows - 1)
+                    np.maximum.at(confidence_map, (grid_y, grid_x), adjusted_confidences)
 
-                    cell_index = grid_y * grid_cols + grid_x
-                    confidence_map[grid_y, grid_x] = max(confidence_map[grid_y, grid_x], adjusted_confidence)
-                    detected_objects_map[cell_index].append(object_name)
+                    cell_indices = grid_y * grid_cols + grid_x
+                    for cell_index, class_id in zip(cell_indices.tolist(), class_ids.tolist()):
+                        detected_objects_map[cell_index].append(object_names[class_id])
 
-            confidence_maps.append(confidence_map)
-            detected_objects_maps.append(detected_objects_map)
+                confidence_maps.append(confidence_map)
+                detected_objects_maps.append(detected_objects_map)
 
         return np.stack(confidence_maps), detected_objects_maps
 
+    def _get_video_reader(self, video_path: str) -> VideoReader:
+        """
+        Return a decord reader for `video_path`, reusing the shared handle for the searched video.
+        """
+        if video_path != self.video_path:
+            return VideoReader(video_path, ctx=cpu(0))
+        return self.video.reader
+
     def read_frame_batch(self, video_path: str, frame_indices: List[int]) -> Tuple[List[int], np.ndarray]:
         """
         Read a batch of frames from the video at specified indices.
 
+        Frames of the searched video are served from a small LRU cache when possible
+        (verification re-reads frames sampled in the same iteration); the rest are
+        decoded in a single ascending `get_batch` call.
+
         Args:
             video_path (str): Video file path.
             frame_indices (List[int]): Indices of frames to read.
@@ -165,8 +214,29 @@ class TStarSearcher:
         Returns:
             Tuple of frame indices and corresponding frame data (numpy array).
         """
-        vr = VideoReader(video_path, ctx=cpu(0))
-        return frame_indices, vr.get_batch(frame_indices).asnumpy()
+        indices = np.asarray(frame_indices, dtype=np.int64).tolist()
+        use_cache = video_path == self.video_path
+
+        # Decode in ascending order so decord walks the stream forward instead of seeking back and forth
+        missing = sorted({idx for idx in indices if not (use_cache and idx in self._frame_cache)})
+        decoded = {}
+        if missing:
+            vr = self._get_video_reader(video_path)
+            decoded = dict(zip(missing, vr.get_batch(missing).asnumpy()))
+
+        frames = []
+        for idx in indices:
+            if idx in decoded:
+                frames.append(decoded[idx])
+            else:
+                self._frame_cache.move_to_end(idx)
+                frames.append(self._frame_cache[idx])
+
+        if use_cache:
+            self._frame_cache.update(decoded)
+            while len(self._frame_cache) > self._frame_cache_size:
+                self._frame_cache.popitem(last=False)
+        return frame_indices, np.stack(frames)
 
     def create_image_grid(self, frames: List[np.ndarray], rows: int, cols: int) -> np.ndarray:
         """
@@ -182,10 +252,18 @@ class TStarSearcher:
         """
         if len(frames) != rows * cols:
             raise ValueError("Frame count does not match grid dimensions")
-        # Resize frames (hardcoded to 200x95 here)
-        resized_frames = [cv2.resize(frame, (200, 95)) for frame in frames]
-        grid_rows = [np.hstack(resized_frames[i * cols:(i + 1) * cols]) for i in range(rows)]
-        return np.vstack(grid_rows)
+        # Tiles are hardcoded to 200x95; INTER_AREA since they are downscaled from full frames.
+        # Each frame is resized straight into its slot of one preallocated canvas.
+        tile_w, tile_h = 200, 95
+        grid = np.empty((rows * tile_h, cols * tile_w) + frames[0].shape[2:], dtype=frames[0].dtype)
+        for i, frame in enumerate(frames):
+            r, c = divmod(i, cols)
+            cv2.resize(
+                frame, (tile_w, tile_h),
+                dst=grid[r * tile_h:(r + 1) * tile_h, c * tile_w:(c + 1) * tile_w],
+                interpolation=cv2.INTER_AREA
+            )
+        return grid
 
     def score_image_grids(
         self,
@@ -208,9 +286,10 @@ class TStarSearcher:
         """
         Save a copy of the current probability distribution and histories.
         """
-        self.P_history.append(copy.deepcopy(self.P).tolist())
-        self.Score_history.append(copy.deepcopy(self.score_distribution).tolist())
-        self.non_visiting_history.append(copy.deepcopy(self.non_visiting_frames).tolist())
+        self.P_history.append(self.P.copy())
+        # Score rows only feed plots, so float32 is plenty; P rows are exported and kept at full precision
+        self.Score_history.append(self.score_distribution.astype(np.float32))
+        self.non_visiting_history.append(self.non_visiting_frames.astype(np.int8))
 
     def update_top_25_with_window(
         self,
@@ -226,19 +305,18 @@ class TStarSearcher:
             sampled_frame_indices (List[int]): Corresponding frame indices.
             window_size (int): Number of neighboring frames to update.
         """
+        frame_confidences = np.asarray(frame_confidences)
         top_25_threshold = np.percentile(frame_confidences, 75)
-        top_25_indices = [
-            frame_idx for frame_idx, confidence in zip(sampled_frame_indices, frame_confidences)
-            if confidence >= top_25_threshold
-        ]
+        top_25_indices = np.asarray(sampled_frame_indices)[frame_confidences >= top_25_threshold]
+
+        video_length = len(self.score_distribution)
         for frame_idx in top_25_indices:
-            for offset in range(-window_size, window_size + 1):
-                neighbor_idx = frame_idx + offset
-                if 0 <= neighbor_idx < len(self.score_distribution):
-                    self.score_distribution[neighbor_idx] = max(
-                        self.score_distribution[neighbor_idx],
-                        self.score_distribution[frame_idx] / (abs(offset) + 1)
-                    )
+            # Frames are processed in order since a window may overlap the next top frame
+            start = max(0, frame_idx - window_size)
+            end = min(video_length, frame_idx + window_size + 1)
+            decay = np.abs(np.arange(start, end) - frame_idx) + 1
+            window = self.score_distribution[start:end]
+            np.maximum(window, self.score_distribution[frame_idx] / decay, out=window)
 
     def spline_keyframe_distribution(
         self,
@@ -257,19 +335,22 @@ class TStarSearcher:
         Returns:
             np.ndarray: Normalized probability distribution.
         """
-        visited_indices = np.array([idx for idx, visited in enumerate(non_visiting_frames) if visited == 0])
-        observed_scores = np.array([score_distribution[idx] for idx in visited_indices])
+        visited_indices = np.flatnonzero(non_visiting_frames == 0)
         if len(visited_indices) == 0:
             return np.ones(video_length) / video_length
+        observed_scores = score_distribution[visited_indices]
 
+        # Imported lazily: scipy.interpolate is slow to import and only needed once scores exist
+        from scipy.interpolate import UnivariateSpline
         spline = UnivariateSpline(visited_indices, observed_scores, s=0.5)
-        all_frames = np.arange(video_length)
-        spline_scores = spline(all_frames)
-
-        # Apply a sigmoid function to smooth the scores
-        sigmoid = lambda x: 1 / (1 + np.exp(-x))
-        adjusted_scores = np.maximum(1 / video_length, spline_scores)
-        p_distribution = sigmoid(adjusted_scores)
+        spline_scores = spline(np.arange(video_length))
+
+        # Apply a sigmoid function to smooth the scores (in place, no temporaries)
+        p_distribution = np.maximum(1 / video_length, spline_scores)
+        np.negative(p_distribution, out=p_distribution)
+        np.exp(p_distribution, out=p_distribution)
+        p_distribution += 1
+        np.reciprocal(p_distribution, out=p_distribution)
         p_distribution /= p_distribution.sum()
         return p_distribution
 
@@ -292,23 +373,19 @@ class TStarSearcher:
                 - List of frame confidences.
                 - List of detected objects for each frame.
         """
-        # Assuming one grid image is used
-        confidence_map = confidence_maps[0]
-        detected_objects_map = detected_objects_maps[0]
-        grid_rows, grid_cols = self.image_grid_shape
-
-        frame_confidences = []
-        frame_detected_objects = []
-        for idx, _ in enumerate(sampled_frame_indices):
-            row = idx // grid_cols
-            col = idx % grid_cols
-            frame_confidences.append(confidence_map[row, col])
-            frame_detected_objects.append(detected_objects_map[idx])
+        # Sampled frames are laid out grid by grid, row-major within each grid
+        num_frames = len(sampled_frame_indices)
+        frame_confidences = np.asarray(confidence_maps).reshape(-1)[:num_frames].tolist()
+        frame_detected_objects = [
+            detected_objects
+            for detected_objects_map in detected_objects_maps
+            for detected_objects in detected_objects_map
+        ][:num_frames]
 
         # Mark frames as visited and update scores
-        for frame_idx, confidence in zip(sampled_frame_indices, frame_confidences):
-            self.non_visiting_frames[frame_idx] = 0
-            self.score_distribution[frame_idx] = confidence
+        sampled_indices = np.asarray(sampled_frame_indices)
+        self.non_visiting_frames[sampled_indices] = 0
+        self.score_distribution[sampled_indices] = frame_confidences
 
         self.update_top_25_with_window(frame_confidences, sampled_frame_indices)
         self.P = self.spline_keyframe_distribution(
@@ -331,7 +408,7 @@ class TStarSearcher:
         Returns:
             Tuple containing:
                 - List of sampled frame "seconds" (indices in the sampling rate).
-                - List of resized frame images.
+                - List of frame images at the video's native resolution.
         """
         if num_samples > self.total_frame_num:
             num_samples = self.total_frame_num
@@ -349,27 +426,18 @@ class TStarSearcher:
             if _P.sum() == 0 or np.count_nonzero(_P) < num_samples:
                 print(f"Warning: Not enough non-zero entries, adjusting probability distribution.")
                 _P = (self.P + num_samples / self.total_frame_num)
-            _P /= _P.sum()
-            sampled_frame_secs = np.random.choice(
-                self.total_frame_num,
-                size=num_samples,
-                replace=False,
-                p=_P
-            )
+            sampled_frame_secs = _weighted_topk(_P, num_samples)
 
         sampled_frame_indices = [int(sec * self.raw_fps / self.fps) for sec in sampled_frame_secs]
         indices, frames = self.read_frame_batch(self.video_path, sampled_frame_indices)
-        resized_frames = [cv2.resize(frame, (200 * 4, 95 * 4)) for frame in frames]
-        return sampled_frame_secs.tolist(), resized_frames
+        # Frames go straight to create_image_grid, which resizes each one to its tile size once
+        return sampled_frame_secs.tolist(), list(frames)
 
     def pop_frames(self, 
                     video_path: str,
                     num_samples: int):
-        # Normalize the score distribution to obtain probabilities.
-        _P = self.score_distribution / self.score_distribution.sum()
-        
-        # Sample frame seconds directly using the probability distribution.
-        sampled_frame_secs = np.random.choice(self.total_frame_num, size=num_samples, replace=False, p=_P)
+        # Sample frame seconds directly using the score distribution as weights.
+        sampled_frame_secs = _weighted_topk(self.score_distribution, num_samples)
         sampled_frame_secs.sort()
         time_stamps_secs = [sec / self.fps for sec in sampled_frame_secs]
         # Convert the sampled seconds to raw frame indices.
@@ -396,28 +464,64 @@ class TStarSearcher:
         Returns:
             bool: True if a target is found and removed, else False.
         """
-        for target in list(self.remaining_targets):
-            if target in detected_objects:
-                frame_idx = int(frame_sec * self.raw_fps / self.fps)
-                _, frame = self.read_frame_batch(self.video_path, [frame_idx])
-                resized_frame = cv2.resize(frame[0], (200 * 3, 95 * 3))
-                conf_map, det_obj_map = self.score_image_grids([resized_frame], (1, 1))
-                single_confidence = conf_map[0, 0, 0]
-                single_detected_objects = det_obj_map[0][0]
+        return self.verify_and_remove_targets([frame_sec], [detected_objects], confidence_threshold)
+
+    def verify_and_remove_targets(
+        self,
+        frame_secs: List[int],
+        detected_objects_list: List[List[str]],
+        confidence_threshold: float,
+    ) -> bool:
+        """
+        Verify target detections for a batch of frames and remove confirmed targets.
+
+        Every frame whose grid detections mention a remaining target is re-read and scored
+        on its own. Reads and detector calls are batched across frames, then the results are
+        applied frame by frame in the same order as sequential verification.
+
+        Args:
+            frame_secs (List[int]): Frame timestamps (in sampled seconds).
+            detected_objects_list (List[List[str]]): Detected objects for each frame.
+            confidence_threshold (float): Threshold for confirmation.
+
+        Returns:
+            bool: True if at least one target is found and removed, else False.
+        """
+        candidates = [
+            (frame_sec, detected_objects)
+            for frame_sec, detected_objects in zip(frame_secs, detected_objects_list)
+            if any(target in detected_objects for target in self.remaining_targets)
+        ]
+        if not candidates:
+            return False
+
+        frame_indices = [int(frame_sec * self.raw_fps / self.fps) for frame_sec, _ in candidates]
+        _, frames = self.read_frame_batch(self.video_path, frame_indices)
+        resized_frames = [cv2.resize(frame, (200 * 3, 95 * 3)) for frame in frames]
+        conf_maps, det_obj_maps = self.score_image_grids(resized_frames, (1, 1))
+        detections_inbatch = self.detections_inbatch
+
+        found = False
+        for i, ((frame_sec, detected_objects), frame_idx) in enumerate(zip(candidates, frame_indices)):
+            for target in list(self.remaining_targets):
+                if target not in detected_objects:
+                    continue
+                single_confidence = conf_maps[i, 0, 0]
+                single_detected_objects = det_obj_maps[i][0]
                 self.score_distribution[frame_sec] = single_confidence
 
+                # Fresh copy per check, since some annotators draw in place
+                resized_frame = resized_frames[i].copy()
                 self.image_grid_iters.append([resized_frame])
-                self.detect_annotot_iters.append(self.heuristic.bbox_visualization(
-                    images=[resized_frame],
-                    detections_inbatch=self.heuristic.detections_inbatch
-                ))
-                self.detect_bbox_iters.append(self.heuristic.detections_inbatch)
+                self._queue_annotation(images=[resized_frame], detections_inbatch=[detections_inbatch[i]])
+                self.detect_bbox_iters.append([detections_inbatch[i]])
 
                 if target in single_detected_objects and single_confidence > confidence_threshold:
                     self.remaining_targets.remove(target)
                     print(f"Found target '{target}' in frame {frame_idx}, score {single_confidence:.2f}")
-                    return True
-        return False
+                    found = True
+                    break
+        return found
 
     # --- Visualization Methods ---
     def plot_score_distribution(self, save_path: Optional[str] = None):
@@ -426,21 +530,94 @@ class TStarSearcher:
 
         Args:
             save_path (Optional[str]): Path to save the plot image.
+
+        Returns:
+            matplotlib.figure.Figure: The rendered figure.
         """
+        # Imported lazily so search/QA-only runs do not pay matplotlib's import cost.
+        # A standalone Agg figure avoids pyplot's global figure registry, so nothing leaks across videos.
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
         time_axis = np.linspace(0, self.duration, len(self.score_distribution))
-        plt.figure(figsize=(12, 6))
-        plt.plot(time_axis, self.score_distribution, label="Score Distribution")
-        plt.xlabel("Time (seconds)")
-        plt.ylabel("Score")
-        plt.title("Score Distribution Over Time")
-        plt.grid(True)
-        plt.legend()
+        fig = Figure(figsize=(12, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        ax.plot(time_axis, self.score_distribution, label="Score Distribution")
+        ax.set_xlabel("Time (seconds)")
+        ax.set_ylabel("Score")
+        ax.set_title("Score Distribution Over Time")
+        ax.grid(True)
+        ax.legend()
         if save_path:
-            plt.savefig(save_path, format='png', dpi=300)
+            fig.savefig(save_path, format='png', dpi=300)
             print(f"Plot saved to {save_path}")
-        plt.show()
+        return fig
 
     # --- Main Search Logic ---
+    def search_iteration(self):
+        """
+        Run one search iteration: sample frames, score their image grids, record the
+        visual history, update the frame distribution and verify candidate targets.
+        """
+        grid_rows, grid_cols = self.image_grid_shape
+        num_frames_in_grid = grid_rows * grid_cols
+        num_grids = max(1, min(self.batch_size, self.total_frame_num // num_frames_in_grid))
+        sampled_frame_secs, frames = self.sample_frames(num_frames_in_grid * num_grids)
+        self.search_budget -= num_frames_in_grid * num_grids
+
+        grid_images = [
+            self.create_image_grid(frames[b * num_frames_in_grid:(b + 1) * num_frames_in_grid], grid_rows, grid_cols)
+            for b in range(num_grids)
+        ]
+        confidence_maps, detected_objects_maps = self.score_image_grids(
+            images=grid_images,
+            image_grids=self.image_grid_shape
+        )
+        # Append grid and detection visualization for history
+        self.image_grid_iters.append(grid_images)
+        self._queue_annotation(images=grid_images, detections_inbatch=self.detections_inbatch)
+        self.detect_bbox_iters.append(self.detections_inbatch)
+
+        frame_confidences, frame_detected_objects = self.update_frame_distribution(
+            sampled_frame_indices=sampled_frame_secs,
+            confidence_maps=confidence_maps,
+            detected_objects_maps=detected_objects_maps
+        )
+        self.verify_and_remove_targets(
+            frame_secs=sampled_frame_secs,
+            detected_objects_list=frame_detected_objects,
+            confidence_threshold=self.confidence_threshold,
+        )
+
+    def _queue_annotation(self, images: List[np.ndarray], detections_inbatch: list):
+        """
+        Render the bbox annotations for one history entry on a background worker.
+
+        Annotation is CPU work that the search itself never reads, so it overlaps
+        with the next iteration's decoding and detector calls. A placeholder keeps
+        the entry's position in `detect_annotot_iters` until `collect_annotations`.
+        """
+        if self._annotation_executor is None:
+            # A single worker keeps entries in order and never runs the annotators concurrently
+            self._annotation_executor = ThreadPoolExecutor(max_workers=1)
+        future = self._annotation_executor.submit(
+            self.heuristic.bbox_visualization, images=images, detections_inbatch=detections_inbatch
+        )
+        self._pending_annotations.append((len(self.detect_annotot_iters), future))
+        self.detect_annotot_iters.append(None)
+
+    def collect_annotations(self):
+        """
+        Wait for queued annotations and fill them into `detect_annotot_iters`.
+        """
+        pending, self._pending_annotations = self._pending_annotations, []
+        for index, future in pending:
+            self.detect_annotot_iters[index] = future.result()
+        if self._annotation_executor is not None:
+            self._annotation_executor.shutdown()
+            self._annotation_executor = None
+
     def search(self) -> Tuple[List[np.ndarray], List[float]]:
         """
         Perform keyframe search using object detection and dynamic sampling.
@@ -450,42 +627,16 @@ class TStarSearcher:
                 - List of keyframe images.
                 - List of corresponding timestamps.
         """
-        K = self.search_nframes
         video_length = int(self.total_frame_num)
         progress_bar = tqdm(total=video_length, desc="Searching Iterations", unit="iter", dynamic_ncols=True)
 
-        while self.remaining_targets and self.search_budget > 0:
-            grid_rows, grid_cols = self.image_grid_shape
-            num_frames_in_grid = grid_rows * grid_cols
-            sampled_frame_secs, frames = self.sample_frames(num_frames_in_grid)
-            self.search_budget -= num_frames_in_grid
-
-            grid_image = self.create_image_grid(frames, grid_rows, grid_cols)
-            confidence_maps, detected_objects_maps = self.score_image_grids(
-                images=[grid_image],
-                image_grids=self.image_grid_shape
-            )
-            # # Append grid and detection visualization for history
-            self.image_grid_iters.append([grid_image])
-            self.detect_annotot_iters.append(self.heuristic.bbox_visualization(
-                images=[grid_image],
-                detections_inbatch=self.heuristic.detections_inbatch
-            ))
-            self.detect_bbox_iters.append(self.heuristic.detections_inbatch)
-
-            frame_confidences, frame_detected_objects = self.update_frame_distribution(
-                sampled_frame_indices=sampled_frame_secs,
-                confidence_maps=confidence_maps,
-                detected_objects_maps=detected_objects_maps
-            )
-            for frame_sec, detected_objects in zip(sampled_frame_secs, frame_detected_objects):
-                self.verify_and_remove_target(
-                    frame_sec=frame_sec,
-                    detected_objects=detected_objects,
-                    confidence_threshold=self.confidence_threshold,
-                )
-            progress_bar.update(1)
-        progress_bar.close()
+        try:
+            while self.remaining_targets and self.search_budget > 0:
+                self.search_iteration()
+                progress_bar.update(1)
+        finally:
+            progress_bar.close()
+            self.collect_annotations()
 
         k_frames, time_stamps = self.pop_frames(video_path=self.video_path, num_samples=self.search_nframes)
         return k_frames, time_stamps
@@ -494,48 +645,13 @@ class TStarSearcher:
         """
         Perform keyframe search and maintain visual history.
 
+        The visual history (image grids, annotations, bboxes) is recorded on every
+        search iteration, so this is equivalent to `search`.
+
         Returns:
             Tuple containing keyframe images and their timestamps.
         """
-
-        K = self.search_nframes
-        video_length = int(self.total_frame_num)
-        progress_bar = tqdm(total=video_length, desc="Searching Iterations", unit="iter", dynamic_ncols=True)
-
-        while self.remaining_targets and self.search_budget > 0:
-            grid_rows, grid_cols = self.image_grid_shape
-            num_frames_in_grid = grid_rows * grid_cols
-            sampled_frame_secs, frames = self.sample_frames(num_frames_in_grid)
-            self.search_budget -= num_frames_in_grid
-
-            grid_image = self.create_image_grid(frames, grid_rows, grid_cols)
-            confidence_maps, detected_objects_maps = self.score_image_grids(
-                images=[grid_image],
-                image_grids=self.image_grid_shape
-            )
-            self.image_grid_iters.append([grid_image])
-            self.detect_annotot_iters.append(self.heuristic.bbox_visualization(
-                images=[grid_image],
-                detections_inbatch=self.heuristic.detections_inbatch
-            ))
-            self.detect_bbox_iters.append(self.heuristic.detections_inbatch)
-
-            frame_confidences, frame_detected_objects = self.update_frame_distribution(
-                sampled_frame_indices=sampled_frame_secs,
-                confidence_maps=confidence_maps,
-                detected_objects_maps=detected_objects_maps
-            )
-            for frame_sec, detected_objects in zip(sampled_frame_secs, frame_detected_objects):
-                self.verify_and_remove_target(
-                    frame_sec=frame_sec,
-                    detected_objects=detected_objects,
-                    confidence_threshold=self.confidence_threshold,
-                )
-            progress_bar.update(1)
-        progress_bar.close()
-
-        k_frames, time_stamps = self.pop_frames(video_path=self.video_path, num_samples=self.search_nframes)
-        return k_frames, time_stamps
+        return self.search()
 
 # Example usage
 if __name__ == "__main__":
@@ -2,22 +2,39 @@ import math
 import base64
 import io
 import os
-from typing import List
+from typing import Dict, List, Optional
 import numpy as np
 from PIL import Image
 import cv2
+from decord import VideoReader, cpu
 
-from matplotlib import pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-import imageio.v3 as imageio
+
+def configure_opencv(num_threads: Optional[int] = None):
+    """
+    Configure OpenCV's optimized code paths and internal thread pool.
+
+    OpenCV parallelizes resize/cvtColor/imencode per row across its own pool. By
+    default two cores are left free for the CUDA driver thread and the Python
+    worker threads that encode frames, so the pools do not oversubscribe the CPU.
+
+    Args:
+        num_threads (Optional[int]): Threads for OpenCV; defaults to max(1, cpu_count - 2).
+    """
+    if num_threads is None:
+        num_threads = max(1, (os.cpu_count() or 1) - 2)
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(num_threads)
 
 
 def encode_image_to_base64(image) -> str:
     """
     Convert an image (PIL.Image or numpy.ndarray) to a Base64 encoded string.
+
+    RGB uint8 arrays are JPEG-encoded with OpenCV (libjpeg-turbo) directly from the
+    array; other inputs go through PIL.
     
     Args:
-        image: A PIL.Image or numpy.ndarray representing the image.
+        image: A PIL.Image or numpy.ndarray (RGB) representing the image.
     
     Returns:
         A Base64 encoded string of the image.
@@ -26,6 +43,12 @@ def encode_image_to_base64(image) -> str:
         ValueError: If the input is neither a PIL.Image nor a numpy.ndarray.
     """
     try:
+        if isinstance(image, np.ndarray) and image.dtype == np.uint8 and image.ndim == 3 and image.shape[2] == 3:
+            # Quality 75 matches PIL's default, so payloads stay the same size as before
+            ok, buffer = cv2.imencode(".jpg", cv2.cvtColor(image, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 75])
+            if not ok:
+                raise ValueError("cv2.imencode failed")
+            return base64.b64encode(buffer).decode("utf-8")
         if isinstance(image, np.ndarray):
             image = Image.fromarray(image)
         if not isinstance(image, Image.Image):
@@ -37,47 +60,121 @@ def encode_image_to_base64(image) -> str:
         raise ValueError(f"Error encoding image: {str(e)}")
 
 
-def load_video_frames(video_path: str, num_frames: int = 8) -> List[Image.Image]:
+class VideoHandle:
+    """
+    A lazily opened decord reader for one video, with its metadata cached.
+
+    Opening a video parses the container and sets up the decoder, so the phases
+    that read the same file (grounding, search, keyframe extraction) share one
+    handle instead of each opening the file again. It can be used as a context
+    manager; `close()` releases the reader and it reopens on next use.
+    """
+
+    def __init__(self, video_path: str):
+        self.video_path = video_path
+        self._reader = None
+        self._fps = None
+
+    @property
+    def reader(self) -> VideoReader:
+        if self._reader is None:
+            try:
+                self._reader = VideoReader(self.video_path, ctx=cpu(0))
+            except Exception as e:
+                raise ValueError(f"Cannot open video: {self.video_path}") from e
+        return self._reader
+
+    @property
+    def total_frames(self) -> int:
+        return len(self.reader)
+
+    @property
+    def fps(self) -> float:
+        if self._fps is None:
+            self._fps = self.reader.get_avg_fps()
+        return self._fps
+
+    def get_batch(self, frame_indices: List[int]) -> np.ndarray:
+        """
+        Decode the given frames as an (N, H, W, 3) RGB array.
+        """
+        return self.reader.get_batch(frame_indices).asnumpy()
+
+    def close(self):
+        self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_video_frames(video_path: str, num_frames: int = 8, video: Optional[VideoHandle] = None) -> List[Image.Image]:
     """
     Load a specified number of frames from a video as PIL.Image objects.
     
     Args:
         video_path (str): Path to the video file.
         num_frames (int): Number of frames to extract.
+        video (Optional[VideoHandle]): Already opened handle for `video_path` to reuse.
     
     Returns:
         A list of PIL.Image objects representing the extracted frames.
     
     Raises:
-        ImportError: If OpenCV is not installed.
         ValueError: If the video cannot be opened or has zero frames.
     """
-    if cv2 is None:
-        raise ImportError("OpenCV is not installed, cannot load video frames.")
-    
-    frames = []
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError(f"Cannot open video: {video_path}")
-    
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if video is None:
+        video = VideoHandle(video_path)
+
+    total_frames = video.total_frames
     if total_frames == 0:
-        cap.release()
         raise ValueError("Video has zero frames or could not retrieve frame count.")
     
     num_frames = min(num_frames, total_frames)
     step = total_frames / num_frames
 
-    for i in range(num_frames):
-        frame_index = int(math.floor(i * step))
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frames.append(Image.fromarray(frame_rgb))
-    
-    cap.release()
+    # Indices are ascending, so the whole batch is decoded in one forward pass over the stream
+    frame_indices = [int(math.floor(i * step)) for i in range(num_frames)]
+    frames = video.get_batch(frame_indices)
+    return [Image.fromarray(frame) for frame in frames]
+
+
+def read_frames_sequential(cap, frame_indices: List[int], max_grab_gap: int = 300) -> Dict[int, np.ndarray]:
+    """
+    Read the requested frames from an opened cv2.VideoCapture in a single forward pass.
+
+    Indices are deduplicated and visited in ascending order. Frames in between are
+    skipped with `grab()`, which demuxes and decodes without converting or copying.
+    A real seek is only issued when the next index is more than `max_grab_gap` frames
+    ahead, where jumping to the nearest keyframe is cheaper than decoding every frame.
+
+    Args:
+        cap: An opened cv2.VideoCapture.
+        frame_indices (List[int]): Frame indices to read, in any order.
+        max_grab_gap (int): Largest forward gap bridged by grabbing instead of seeking.
+
+    Returns:
+        Dict mapping each successfully read frame index to its BGR frame.
+    """
+    frames = {}
+    # Index the next read returns; None if unknown (some backends report -1), which forces a seek
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if position < 0:
+        position = None
+    for idx in sorted(set(frame_indices)):
+        if position is None or idx < position or idx - position > max_grab_gap:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            position = idx
+        while position < idx and cap.grab():
+            position += 1
+        ret, frame = cap.read() if position == idx else (False, None)
+        if ret:
+            frames[idx] = frame
+            position += 1
+        else:
+            position = None
     return frames
 
 
@@ -91,11 +188,15 @@ def save_as_gif(images, output_gif_path):
     """
     fps = 1  # Frames per second
     duration = int(1000 / fps)  # Duration per frame in milliseconds
-    pil_images = [Image.fromarray(img.astype('uint8')) for img in images]
-    pil_images[0].save(
+    # Frames are converted lazily; PIL's GIF writer collects them all before writing,
+    # and each frame keeps its own adaptive palette so detection colours are preserved.
+    # No copy for the usual case of contiguous uint8 annotations.
+    pil_frames = (Image.fromarray(np.ascontiguousarray(img, dtype=np.uint8)) for img in images)
+    first_frame = next(pil_frames)
+    first_frame.save(
         output_gif_path,
         save_all=True,
-        append_images=pil_images[1:],
+        append_images=pil_frames,
         duration=duration,
         loop=0
     )
@@ -104,6 +205,46 @@ def save_as_gif(images, output_gif_path):
 
 
 
+def save_as_mp4(images, output_video_path, fps: int = 1) -> bool:
+    """
+    Save a list of RGB images as an MP4 video with OpenCV's encoder.
+
+    Frames whose size differs from the first frame are resized to match, since a
+    video stream has a single resolution.
+
+    Args:
+        images: A list of image arrays (RGB).
+        output_video_path: Path to save the resulting video.
+        fps (int): Frames per second.
+
+    Returns:
+        True if the video was written, False if no MP4 encoder is available.
+    """
+    if len(images) == 0:
+        return False
+    height, width = images[0].shape[:2]
+    writer = None
+    for codec in ("avc1", "mp4v"):  # H.264 if the OpenCV build has it, else MPEG-4 Part 2
+        writer = cv2.VideoWriter(output_video_path, cv2.VideoWriter_fourcc(*codec), fps, (width, height))
+        if writer.isOpened():
+            break
+        writer.release()
+        writer = None
+    if writer is None:
+        return False
+
+    try:
+        for img in images:
+            frame = np.ascontiguousarray(img, dtype=np.uint8)
+            if frame.shape[:2] != (height, width):
+                frame = cv2.resize(frame, (width, height))
+            writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+    finally:
+        writer.release()
+    print(f"Saved video: {output_video_path}")
+    return True
+
+
 def extract_frames(video_path, output_dir, fps=1):
     """
     Extract frames from a video at a specified frame rate.
@@ -124,10 +265,13 @@ def extract_frames(video_path, output_dir, fps=1):
     saved_count = 0
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        # Only frames that are kept get decoded into an image; the rest are just grabbed
+        if not cap.grab():
             break
         if frame_count % frame_interval == 0:
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
             frame_filename = os.path.join(output_dir, f"frame_{saved_count:04d}.jpg")
             cv2.imwrite(frame_filename, frame)
             print(f"Saved: {frame_filename}")
@@ -146,6 +290,8 @@ def extract_frames_from_gif(input_gif_path, output_dir):
         input_gif_path (str): Path to the input GIF.
         output_dir (str): Directory where frames will be saved.
     """
+    import imageio.v3 as imageio  # imported lazily; only GIF frame extraction needs imageio
+
     base_name = os.path.basename(input_gif_path).split('.')[0]
     output_subdir = os.path.join(output_dir, base_name)
     os.makedirs(output_subdir, exist_ok=True)
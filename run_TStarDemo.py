@@ -26,6 +26,8 @@ def main():
     parser.add_argument('--grid_cols', type=int, default=4, help='Number of columns in the image grid.')
     parser.add_argument('--confidence_threshold', type=float, default=0.6, help='YOLO detection confidence threshold.')
     parser.add_argument('--search_budget', type=float, default=0.5, help='Maximum ratio of frames to process during search.')
+    parser.add_argument('--batch_size', type=int, default=1, help='Image grids sampled and scored per search iteration (one detector forward pass). Not just a throughput knob: the sampling distribution is updated once per batch and each iteration spends grid_rows*grid_cols*batch_size frames of the budget.')
+    parser.add_argument('--iterations_format', type=str, default='gif', choices=['gif', 'mp4'], help='Format of the saved search-iteration recordings.')
     parser.add_argument('--output_dir', type=str, default='./output', help='Directory to save outputs.')
     
     args = parser.parse_args()
@@ -43,6 +45,8 @@ def main():
         confidence_threshold=args.confidence_threshold,
         search_budget=args.search_budget,
         output_dir=args.output_dir,
+        batch_size=args.batch_size,
+        iterations_format=args.iterations_format,
     )
 
     # Display the results